@@ -0,0 +1,101 @@
+# ap_table.py
+
+from dataclasses import dataclass, field
+
+@dataclass
+class AccessPoint:
+    """One SSID seen in a scan. Signal is the nmcli 0-100 quality of its strongest BSSID."""
+    ssid: str
+    signal: int = 0
+    bssids: dict = field(default_factory=dict) # BSSID -> signal, for every radio advertising this SSID
+
+    def bssids_by_signal(self):
+        """BSSIDs strongest first."""
+        return sorted(self.bssids, key=self.bssids.get, reverse=True)
+
+@dataclass
+class ScanDiff:
+    """What a scan changed in an ApTable, as lists of SSIDs."""
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+class ApTable:
+    """Scan results indexed by SSID, kept in first-seen order so rows stay put across rescans."""
+
+    def __init__(self):
+        self._aps = {}     # SSID -> AccessPoint
+        self._order = []   # SSIDs in display order
+        self._index = {}   # SSID -> position in _order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._aps[ssid] for ssid in self._order[position]]
+        return self._aps[self._order[position]]
+
+    def __iter__(self):
+        return (self._aps[ssid] for ssid in self._order)
+
+    def __contains__(self, ssid):
+        return ssid in self._aps
+
+    def get(self, ssid):
+        return self._aps.get(ssid)
+
+    def index_of(self, ssid):
+        """Returns the display position of `ssid`, or None if it is not in the table."""
+        return self._index.get(ssid)
+
+    def clear(self):
+        self._aps = {}
+        self._order = []
+        self._index = {}
+
+    def apply_scan(self, scanned_aps):
+        """Merges a fresh scan into the table and returns what changed.
+
+        Existing rows keep their position; new SSIDs are appended and vanished
+        ones dropped. Only the changed entries are touched, except that any
+        removal re-packs the display order once.
+        """
+        scanned = {}
+        for ap in scanned_aps:
+            known = scanned.get(ap.ssid)
+            if known is None:
+                scanned[ap.ssid] = AccessPoint(ap.ssid, ap.signal, dict(ap.bssids))
+            else:
+                known.signal = max(known.signal, ap.signal)
+                known.bssids.update(ap.bssids)
+
+        diff = ScanDiff()
+        for ssid, ap in scanned.items():
+            current = self._aps.get(ssid)
+            if current is None:
+                diff.added.append(ssid)
+            elif current.signal != ap.signal:
+                diff.changed.append(ssid)
+        if len(scanned) - len(diff.added) != len(self._aps):
+            diff.removed = [ssid for ssid in self._order if ssid not in scanned]
+
+        for ssid in diff.changed:
+            self._aps[ssid].signal = scanned[ssid].signal
+        # BSSIDs are not shown, so they are refreshed without counting as a change
+        for ssid, ap in scanned.items():
+            if ssid in self._aps:
+                self._aps[ssid].bssids = ap.bssids
+        if diff.removed:
+            for ssid in diff.removed:
+                del self._aps[ssid]
+            self._order = [ssid for ssid in self._order if ssid in self._aps]
+            self._index = {ssid: position for position, ssid in enumerate(self._order)}
+        for ssid in diff.added:
+            self._aps[ssid] = scanned[ssid]
+            self._index[ssid] = len(self._order)
+            self._order.append(ssid)
+        return diff
@@ -1,7 +1,7 @@
 # config.py
 
 # --- Project Settings ---
-WIFI_PASSWORD = "password"
+WIFI_PASSWORD = "password" # Default password for product families without their own
 START_BUTTON_GPIO = 16
 STOP_BUTTON_GPIO = 26
 ROTARY_ENCODER_A_GPIO = 17
@@ -13,13 +13,75 @@ OLED_WIDTH = 128
 OLED_HEIGHT = 64
 OLED_LINE_MAX_CHARS = 18  # Max characters per line on OLED
 OLED_SCROLL_DELAY = 0.30  # Scroll speed in seconds
+OLED_MAX_FPS = 10         # Cap on frames per second pushed for scrolling text (page changes are always immediate)
+OLED_IDLE_SLOWDOWN_AFTER = 30   # seconds without changes before scrolling text slows down
+OLED_IDLE_SCROLL_SLOWDOWN = 3   # Scroll delay multiplier while idle
+OLED_MARQUEE_IDLE_TIMEOUT = 120 # seconds without changes before scrolling text stops
+OLED_CONTRAST = 255             # Normal panel contrast (0-255)
+OLED_DIM_TIMEOUT = 300          # seconds idle before the panel is dimmed; 0 disables
+OLED_DIM_CONTRAST = 1           # Contrast while dimmed
+OLED_BLANK_TIMEOUT = 1800       # seconds idle before the panel is switched off; 0 disables
+
+# Rotary Encoder
+ENCODER_ACCEL_MIN_RATE = 8.0        # detents/second before fast-spin acceleration kicks in
+ENCODER_ACCEL_MAX_MULTIPLIER = 16   # Upper bound for entries moved per detent on a fast spin
+ENCODER_HOLD_TIME = 0.8             # seconds; holding the encoder button toggles first-letter jump mode
 
 # Network
 HOSTNAME_PREFIX = "RPi0-"
 WIFI_INTERFACE_PREFIX = "wlx"
 WIFI_SSID_PREFIX_FILTER = "QW-"
+# SSID filters, one per product family: pattern -> password (None uses WIFI_PASSWORD).
+# Patterns are prefixes ("QW-"), globs ("QW-*-LAB") or regexes starting with "re:" ("re:QW[0-9]+-").
+# The first listed pattern that matches an SSID decides its password.
+WIFI_SSID_FILTERS = {
+    WIFI_SSID_PREFIX_FILTER: None,
+}
+
+# Config reload (changes to this file are applied without restarting; GPIO pins still need a restart)
+CONFIG_RELOAD_SETTLE_TIME = 0.2   # seconds to wait for a save to finish before reloading
+CONFIG_RELOAD_POLL_INTERVAL = 2.0 # seconds; only used when inotify is unavailable
 
 # Timeouts
 NMCLI_RESCAN_TIMEOUT = 15  # seconds
 NMCLI_LIST_TIMEOUT = 10    # seconds
 NMCLI_CONNECT_TIMEOUT = 45 # seconds
+
+# Link probe (runs after a successful connect; results go to the STATUS page and the results log)
+LINK_PROBE_ENABLED = True
+LINK_PROBE_PING_COUNT = 5          # pings to the gateway for RTT/jitter/loss
+LINK_PROBE_PING_INTERVAL = 0.2     # seconds between pings
+LINK_PROBE_THROUGHPUT_PEER = None  # "host:port" running `python3 link_probe.py --serve PORT`; None skips the throughput test
+LINK_PROBE_THROUGHPUT_SECONDS = 2.0
+LINK_PROBE_MAX_RTT_MS = 50         # Links slower, lossier or with less throughput than this are reported as "Weak Link"
+LINK_PROBE_MAX_LOSS_PCT = 20
+LINK_PROBE_MIN_THROUGHPUT_KBPS = 500
+LINK_RESULTS_LOG_PATH = "/var/log/wifi_manager_results.jsonl" # One JSON line per connection attempt; None disables
+
+# Connection retries
+CONNECT_MAX_ATTEMPTS = 3          # attempts per connect, moving to the next-strongest BSSID after each failure
+CONNECT_RETRY_BACKOFF = 1.0       # seconds before the 2nd attempt; doubles on each further attempt
+CONNECT_RETRY_MAX_BACKOFF = 8.0
+CONNECT_FAILURE_HALF_LIFE = 600   # seconds for a remembered failure to count half as much
+CONNECT_FAILURE_SKIP_SCORE = 2.5  # ~3 recent failed connects; SSIDs/BSSIDs at or above this score are marked "!" and skipped by batch-connect
+
+# Control API (local automation; drives the same actions as the rotary encoder)
+CONTROL_API_ENABLED = True
+CONTROL_API_HOST = "127.0.0.1"
+CONTROL_API_PORT = 8765
+CONTROL_API_UNIX_SOCKET = None  # e.g. "/run/wifi_manager.sock"; when set, used instead of HOST/PORT
+CONTROL_API_SCAN_MAX_AGE = 30   # seconds GET /aps serves cached scan results before rescanning
+
+# Logging
+LOG_SINK = "stdout"           # "stdout", "file" or "journald" (journald needs systemd-python, otherwise stdout is used)
+LOG_FILE_PATH = "/var/log/wifi_manager.log"
+LOG_RING_SIZE = 1000          # records buffered for the background flusher before the oldest are dropped
+LOG_FLUSH_INTERVAL = 1.0      # seconds between batched flushes
+LOG_FLUSH_BATCH_SIZE = 50     # flush early once this many records are waiting
+LOG_PAGE_ENTRIES = 100        # latest records kept for the OLED LOG page
+LOG_LEVELS = {                # logger (module) name -> level; "" is the default for all modules
+    "": "INFO",
+    "network_operations": "INFO",
+    "oled_manager": "INFO",
+    "gpio_input_handler": "INFO",
+}
@@ -0,0 +1,140 @@
+# config_watcher.py
+
+import logging
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import config
+
+logger = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, name length
+
+CONFIG_PATH = os.path.abspath(config.__file__)
+
+watcher_thread = None
+watcher_stop_event = None
+reload_callbacks = []
+
+def reload_config():
+    """Re-executes config.py and updates the config module in place so every `config.X` lookup sees the new values.
+
+    The file runs in a fresh namespace first and is copied into `config` only if
+    it ran to the end, so a half-saved or broken config.py (syntax or runtime
+    error) is reported and the running settings are kept untouched. Settings
+    removed from the file keep their last value until restart, as with a
+    module reload. Returns True if the config was reloaded.
+    """
+    namespace = {"__name__": config.__name__, "__file__": CONFIG_PATH}
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            exec(compile(f.read(), CONFIG_PATH, "exec"), namespace)
+    except Exception as e:
+        logger.error(f"config.py not reloaded, keeping previous settings: {e}")
+        return False
+
+    for name, value in namespace.items():
+        if not name.startswith("__"):
+            setattr(config, name, value)
+    logger.info("config.py reloaded.")
+    for callback in reload_callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Config reload callback failed: {e}")
+    return True
+
+def _open_inotify():
+    """Returns an inotify fd watching the config directory, or None if inotify is unavailable."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return None
+        # Watch the directory: editors often save by writing a new file and renaming it over config.py
+        wd = libc.inotify_add_watch(fd, os.path.dirname(CONFIG_PATH).encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        if wd < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+def _config_changed_in(events_buffer):
+    config_name = os.path.basename(CONFIG_PATH).encode()
+    offset = 0
+    while offset + INOTIFY_EVENT_HEADER.size <= len(events_buffer):
+        _, _, _, name_len = INOTIFY_EVENT_HEADER.unpack_from(events_buffer, offset)
+        offset += INOTIFY_EVENT_HEADER.size
+        name = events_buffer[offset:offset + name_len].rstrip(b"\0")
+        offset += name_len
+        if name == config_name:
+            return True
+    return False
+
+def _inotify_watch_loop(fd, stop_event):
+    try:
+        while not stop_event.is_set():
+            readable, _, _ = select.select([fd], [], [], 1.0)
+            if not readable:
+                continue
+            changed = _config_changed_in(os.read(fd, 4096))
+            # Let a burst of writes from one save settle, then drain it as a single change
+            while select.select([fd], [], [], config.CONFIG_RELOAD_SETTLE_TIME)[0]:
+                changed = _config_changed_in(os.read(fd, 4096)) or changed
+            if changed:
+                reload_config()
+    finally:
+        os.close(fd)
+
+def _poll_watch_loop(stop_event):
+    last_mtime = _config_mtime()
+    while not stop_event.wait(timeout=config.CONFIG_RELOAD_POLL_INTERVAL):
+        mtime = _config_mtime()
+        if mtime != last_mtime:
+            last_mtime = mtime
+            reload_config()
+
+def _config_mtime():
+    try:
+        return os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+def start_config_watcher(on_reload=None):
+    """Starts a daemon thread that reloads config.py whenever it changes on disk.
+
+    Uses inotify where available and falls back to polling the file's mtime.
+    """
+    global watcher_thread, watcher_stop_event
+    if on_reload and on_reload not in reload_callbacks:
+        reload_callbacks.append(on_reload)
+    if watcher_thread and watcher_thread.is_alive():
+        return
+
+    watcher_stop_event = threading.Event()
+    fd = _open_inotify()
+    if fd is not None:
+        watcher_thread = threading.Thread(target=_inotify_watch_loop, args=(fd, watcher_stop_event), daemon=True)
+        logger.info(f"Watching {CONFIG_PATH} for changes (inotify).")
+    else:
+        watcher_thread = threading.Thread(target=_poll_watch_loop, args=(watcher_stop_event,), daemon=True)
+        logger.info(f"Watching {CONFIG_PATH} for changes (polling).")
+    watcher_thread.start()
+
+def stop_config_watcher():
+    global watcher_thread, watcher_stop_event
+    if watcher_stop_event:
+        watcher_stop_event.set()
+    if watcher_thread and watcher_thread.is_alive():
+        watcher_thread.join(timeout=2)
+    watcher_thread = None
+    watcher_stop_event = None
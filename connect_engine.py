@@ -0,0 +1,85 @@
+# connect_engine.py
+
+import logging
+import threading
+import time
+import config
+import network_operations
+
+logger = logging.getLogger(__name__)
+
+# Results worth another attempt; anything else that is not an IP ends the retries
+RETRYABLE_RESULTS = ("Timeout", "Not Connected", "No IP Acquired", "Error Occurred")
+NON_IP_RESULTS = RETRYABLE_RESULTS + ("No Interface",)
+
+# SSID or BSSID -> (failure score, time.monotonic() of the last update)
+failure_scores = {}
+failure_lock = threading.Lock()
+
+
+def _decayed(score, updated_at, now):
+    return score * 0.5 ** ((now - updated_at) / config.CONNECT_FAILURE_HALF_LIFE)
+
+def failure_score(key):
+    """Current failure score of an SSID or BSSID; each failure adds 1 and the score halves every CONNECT_FAILURE_HALF_LIFE seconds."""
+    with failure_lock:
+        entry = failure_scores.get(key)
+    if entry is None:
+        return 0.0
+    return _decayed(entry[0], entry[1], time.monotonic())
+
+def record_failure(*keys, weight=1.0):
+    now = time.monotonic()
+    with failure_lock:
+        for key in keys:
+            if not key:
+                continue
+            score, updated_at = failure_scores.get(key, (0.0, now))
+            failure_scores[key] = (_decayed(score, updated_at, now) + weight, now)
+        # Forget keys that have decayed to nothing so the table stays small
+        for key in [key for key, (score, updated_at) in failure_scores.items() if _decayed(score, updated_at, now) < 0.05]:
+            del failure_scores[key]
+
+def record_success(*keys):
+    with failure_lock:
+        for key in keys:
+            failure_scores.pop(key, None)
+
+def is_chronic_failure(key):
+    """True if the SSID or BSSID fails often enough to be flagged in lists and skipped in batch runs."""
+    return failure_score(key) >= config.CONNECT_FAILURE_SKIP_SCORE
+
+def order_bssids(access_point):
+    """BSSIDs to try for an AP: healthy ones before chronically failing ones, then strongest first."""
+    if access_point is None:
+        return []
+    return sorted(access_point.bssids_by_signal(), key=is_chronic_failure)
+
+def connect_with_retries(ssid, wlx_interface_val, access_point=None, on_attempt=None):
+    """Connects to `ssid`, retrying with exponential backoff and moving to the next-strongest BSSID after each failure.
+
+    on_attempt(attempt_number, bssid) is called before every attempt so the UI can show progress.
+    Returns (result, bssid) where result is what network_operations.connect_to_wifi returned last.
+    """
+    candidates = order_bssids(access_point)
+    result = None
+    bssid = None
+    for attempt in range(config.CONNECT_MAX_ATTEMPTS):
+        # With a single radio there is nothing to fall back to; let NetworkManager pick
+        bssid = candidates[attempt % len(candidates)] if len(candidates) > 1 else None
+        if on_attempt:
+            on_attempt(attempt + 1, bssid)
+
+        result = network_operations.connect_to_wifi(ssid, wlx_interface_val, bssid)
+        if result not in NON_IP_RESULTS and result is not None:
+            record_success(ssid, bssid)
+            return result, bssid
+
+        record_failure(bssid)
+        logger.warning(f"Attempt {attempt + 1}/{config.CONNECT_MAX_ATTEMPTS} to '{ssid}'{f' via {bssid}' if bssid else ''} failed: {result}")
+        if result not in RETRYABLE_RESULTS or attempt + 1 == config.CONNECT_MAX_ATTEMPTS:
+            break
+        time.sleep(min(config.CONNECT_RETRY_BACKOFF * 2 ** attempt, config.CONNECT_RETRY_MAX_BACKOFF))
+    # The SSID is charged once per failed connect, not once per attempt
+    record_failure(ssid)
+    return result, bssid
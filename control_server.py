@@ -0,0 +1,251 @@
+# control_server.py
+
+import json
+import logging
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+import config
+import connect_engine
+
+logger = logging.getLogger(__name__)
+
+status_callback = None
+list_callback = None
+scan_callback = None
+scan_age_callback = None
+connect_callback = None
+disconnect_callback = None
+
+server_instance = None
+server_thread = None
+
+# Requests currently being served, keyed by what they do; identical concurrent requests share one result
+inflight_calls = {}
+inflight_lock = threading.Lock()
+
+
+def _single_flight(key, function):
+    """Runs `function` once for all concurrent callers using the same key and hands each of them the result."""
+    with inflight_lock:
+        call = inflight_calls.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = {"done": threading.Event(), "result": None, "error": None}
+            inflight_calls[key] = call
+
+    if not is_leader:
+        logger.debug(f"Joining in-flight request {key}.")
+        call["done"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    try:
+        call["result"] = function()
+        return call["result"]
+    except Exception as e:
+        call["error"] = e
+        raise
+    finally:
+        with inflight_lock:
+            del inflight_calls[key]
+        call["done"].set()
+
+
+def _scan():
+    return _single_flight(("scan",), scan_callback)
+
+def _list_aps(force_scan=False):
+    """Serves the cached AP table, rescanning only if it was never filled or is older than CONTROL_API_SCAN_MAX_AGE."""
+    scan_age = scan_age_callback()
+    if force_scan or scan_age is None or scan_age > config.CONTROL_API_SCAN_MAX_AGE:
+        _scan()
+    return list_callback()
+
+def _unknown_ssids(ssids):
+    """SSIDs not in the current scan results. Only scanned, filtered SSIDs may be connected to."""
+    known_ssids = {ap["ssid"] for ap in list_callback()["aps"]}
+    return [ssid for ssid in ssids if ssid not in known_ssids]
+
+def _connect(ssid):
+    return _single_flight(("connect", ssid), lambda: connect_callback(ssid))
+
+def _disconnect():
+    return _single_flight(("disconnect",), disconnect_callback)
+
+def _batch_connect(ssids):
+    """Connects to each SSID in turn, disconnecting after each one, and reports every result.
+
+    SSIDs that keep failing (see connect_engine) are reported as skipped instead of burning retries on them.
+    """
+    def run_batch():
+        results = []
+        for ssid in ssids:
+            if connect_engine.is_chronic_failure(ssid):
+                logger.info(f"Batch connect: skipping '{ssid}' (failure score {connect_engine.failure_score(ssid):.1f}).")
+                results.append({"ssid": ssid, "status": "Skipped"})
+                continue
+            result = connect_callback(ssid)
+            disconnect_callback()
+            results.append(result)
+        return {"results": results}
+    return _single_flight(("batch-connect", tuple(ssids)), run_batch)
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over the same actions as the rotary encoder.
+
+    GET  /status                      Connection and page state
+    GET  /aps[?refresh=1]             Cached scan results (rescans when stale or asked to)
+    POST /scan                        Rescan now
+    POST /connect {"ssid": ...}       Connect to one SSID
+    POST /disconnect                  Disconnect the WiFi interface
+    POST /batch-connect {"ssids": []} Connect to each SSID in turn
+    """
+
+    server_version = "WifiManagerControl/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("Control API: " + format % args)
+
+    def _send_json(self, status_code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length == 0:
+            return {}
+        body = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == "/status":
+                self._send_json(200, status_callback())
+            elif url.path == "/aps":
+                if not status_callback()["project_running"]:
+                    self._send_json(409, {"error": "Project not running"})
+                    return
+                self._send_json(200, _list_aps(force_scan=parse_qs(url.query).get("refresh") == ["1"]))
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint {url.path}"})
+        except Exception as e:
+            logger.error(f"Control API request {url.path} failed: {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            request_body = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        try:
+            if url.path not in ("/scan", "/connect", "/disconnect", "/batch-connect"):
+                self._send_json(404, {"error": f"Unknown endpoint {url.path}"})
+                return
+            if not status_callback()["project_running"]:
+                self._send_json(409, {"error": "Project not running"})
+                return
+
+            if url.path == "/scan":
+                _scan()
+                self._send_json(200, list_callback())
+            elif url.path == "/connect":
+                ssid = request_body.get("ssid")
+                if not isinstance(ssid, str) or not ssid:
+                    self._send_json(400, {"error": "'ssid' is required"})
+                    return
+                if _unknown_ssids([ssid]):
+                    self._send_json(404, {"error": f"SSID '{ssid}' is not in the scan results"})
+                    return
+                self._send_json(200, _connect(ssid))
+            elif url.path == "/disconnect":
+                self._send_json(200, _disconnect())
+            elif url.path == "/batch-connect":
+                ssids = request_body.get("ssids")
+                if not isinstance(ssids, list) or not all(isinstance(ssid, str) and ssid for ssid in ssids):
+                    self._send_json(400, {"error": "'ssids' must be a list of SSIDs"})
+                    return
+                unknown_ssids = _unknown_ssids(ssids)
+                if unknown_ssids:
+                    self._send_json(404, {"error": "SSIDs not in the scan results", "ssids": unknown_ssids})
+                    return
+                self._send_json(200, _batch_connect(ssids))
+        except Exception as e:
+            logger.error(f"Control API request {url.path} failed: {e}")
+            self._send_json(500, {"error": str(e)})
+
+
+class ThreadingHTTPControlServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class ThreadingUnixControlServer(ThreadingHTTPControlServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address) # Stale socket from a previous run
+        self.socket.bind(self.server_address)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def get_request(self):
+        request, _ = self.socket.accept()
+        return request, ("unix", 0)
+
+
+def start_control_server(status_cb, list_cb, scan_cb, scan_age_cb, connect_cb, disconnect_cb):
+    """Starts the local control API on CONTROL_API_UNIX_SOCKET, or on CONTROL_API_HOST:CONTROL_API_PORT if no socket is set."""
+    global server_instance, server_thread
+    global status_callback, list_callback, scan_callback, scan_age_callback, connect_callback, disconnect_callback
+
+    if not config.CONTROL_API_ENABLED:
+        logger.info("Control API disabled.")
+        return None
+
+    status_callback = status_cb
+    list_callback = list_cb
+    scan_callback = scan_cb
+    scan_age_callback = scan_age_cb
+    connect_callback = connect_cb
+    disconnect_callback = disconnect_cb
+
+    try:
+        if config.CONTROL_API_UNIX_SOCKET:
+            server_instance = ThreadingUnixControlServer(config.CONTROL_API_UNIX_SOCKET, ControlRequestHandler)
+            logger.info(f"Control API listening on unix socket {config.CONTROL_API_UNIX_SOCKET}.")
+        else:
+            server_instance = ThreadingHTTPControlServer((config.CONTROL_API_HOST, config.CONTROL_API_PORT), ControlRequestHandler)
+            logger.info(f"Control API listening on http://{config.CONTROL_API_HOST}:{config.CONTROL_API_PORT}.")
+    except OSError as e:
+        logger.error(f"Control API could not start: {e}")
+        server_instance = None
+        return None
+
+    server_thread = threading.Thread(target=server_instance.serve_forever, daemon=True)
+    server_thread.start()
+    return server_instance
+
+def stop_control_server():
+    global server_instance, server_thread
+    if server_instance:
+        server_instance.shutdown()
+        server_instance.server_close()
+        if isinstance(server_instance, ThreadingUnixControlServer) and os.path.exists(server_instance.server_address):
+            os.remove(server_instance.server_address)
+    server_instance = None
+    server_thread = None
@@ -1,10 +1,15 @@
 # gpio_input_handler.py
 
+import logging
 from gpiozero import RotaryEncoder, Button
+import time
 import config
 
+logger = logging.getLogger(__name__)
+
 rotate_callback = None
 click_callback = None
+hold_callback = None
 start_action_callback = None
 stop_action_callback = None
 
@@ -13,14 +18,18 @@ button_instance = None
 start_switch_instance = None
 stop_switch_instance = None
 
+last_rotation_time = None
+button_was_held = False
+
 
-def setup_gpio(rotate_cb, click_cb, start_cb, stop_cb):
+def setup_gpio(rotate_cb, click_cb, start_cb, stop_cb, hold_cb=None):
     """Sets up GPIO pins and event handlers."""
     global encoder_instance, button_instance, start_switch_instance, stop_switch_instance
-    global rotate_callback, click_callback, start_action_callback, stop_action_callback
+    global rotate_callback, click_callback, hold_callback, start_action_callback, stop_action_callback
 
     rotate_callback = rotate_cb
     click_callback = click_cb
+    hold_callback = hold_cb
     start_action_callback = start_cb
     stop_action_callback = stop_cb
 
@@ -28,8 +37,10 @@ def setup_gpio(rotate_cb, click_cb, start_cb, stop_cb):
         encoder_instance = RotaryEncoder(a=config.ROTARY_ENCODER_A_GPIO, b=config.ROTARY_ENCODER_B_GPIO, max_steps=0)
         encoder_instance.when_rotated = internal_handle_rotation
         
-        button_instance = Button(config.ROTARY_ENCODER_BUTTON_GPIO, pull_up=True, bounce_time=0.1)
-        button_instance.when_pressed = internal_handle_click
+        button_instance = Button(config.ROTARY_ENCODER_BUTTON_GPIO, pull_up=True, bounce_time=0.1, hold_time=config.ENCODER_HOLD_TIME)
+        button_instance.when_pressed = internal_handle_press
+        button_instance.when_held = internal_handle_hold
+        button_instance.when_released = internal_handle_click
         
         start_switch_instance = Button(config.START_BUTTON_GPIO, pull_up=True, bounce_time=0.2)
         start_switch_instance.when_pressed = start_action_callback
@@ -37,20 +48,48 @@ def setup_gpio(rotate_cb, click_cb, start_cb, stop_cb):
         stop_switch_instance = Button(config.STOP_BUTTON_GPIO, pull_up=True, bounce_time=0.2)
         stop_switch_instance.when_pressed = stop_action_callback
         
-        print("GPIO setup complete.")
+        logger.info("GPIO setup complete.")
         return encoder_instance 
     except Exception as e:
-        print(f"ERROR: GPIO setup failed: {e}")
+        logger.error(f"GPIO setup failed: {e}")
         return None
 
+def accelerate_delta(delta, now=None):
+    """Scales a detent delta by spin velocity so fast spins cover many entries."""
+    global last_rotation_time
+    now = time.monotonic() if now is None else now
+    previous_time = last_rotation_time
+    last_rotation_time = now
+    if previous_time is None or now <= previous_time:
+        return delta
+
+    rate = abs(delta) / (now - previous_time) # detents per second
+    if rate <= config.ENCODER_ACCEL_MIN_RATE:
+        return delta
+    multiplier = min(int((rate / config.ENCODER_ACCEL_MIN_RATE) ** 2), config.ENCODER_ACCEL_MAX_MULTIPLIER)
+    return delta * max(1, multiplier)
+
 def internal_handle_rotation():
     if encoder_instance and rotate_callback:
         delta = round(encoder_instance.steps)
         encoder_instance.steps = 0 
         if delta != 0:
-            rotate_callback(delta)
+            rotate_callback(accelerate_delta(delta))
+
+def internal_handle_press():
+    global button_was_held
+    button_was_held = False
+
+def internal_handle_hold():
+    global button_was_held
+    button_was_held = True
+    if hold_callback:
+        hold_callback()
 
 def internal_handle_click():
+    # A release that ends a handled hold is not a click
+    if button_was_held and hold_callback:
+        return
     if click_callback:
         click_callback()
 
@@ -69,4 +108,4 @@ def cleanup_gpio():
     if stop_switch_instance:
         stop_switch_instance.close()
         stop_switch_instance = None
-    print("GPIO resources closed.")
+    logger.info("GPIO resources closed.")
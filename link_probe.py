@@ -0,0 +1,133 @@
+# link_probe.py
+
+import json
+import logging
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+import config
+
+logger = logging.getLogger(__name__)
+
+PING_TIME_PATTERN = re.compile(r"time[=<]([\d.]+)\s*ms")
+THROUGHPUT_CHUNK = b"\0" * 16384
+
+def measure_rtt(gateway, wlx_interface_val):
+    """Pings the gateway through the WiFi interface. Returns (rtt_ms, jitter_ms, loss_pct); RTT/jitter are None if nothing came back.
+
+    Jitter is the mean absolute difference between consecutive RTTs.
+    """
+    count = config.LINK_PROBE_PING_COUNT
+    command = ["ping", "-n", "-c", str(count), "-i", str(config.LINK_PROBE_PING_INTERVAL), "-W", "1", "-I", wlx_interface_val, gateway]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=count * (config.LINK_PROBE_PING_INTERVAL + 1) + 5)
+        output = result.stdout.decode("utf-8", errors="ignore")
+    except (subprocess.TimeoutExpired, OSError) as e:
+        logger.error(f"Ping to gateway {gateway} failed: {e}")
+        return None, None, 100.0
+
+    rtts = [float(value) for value in PING_TIME_PATTERN.findall(output)]
+    loss_pct = round(100.0 * (count - len(rtts)) / count, 1)
+    if not rtts:
+        return None, None, loss_pct
+    rtt_ms = sum(rtts) / len(rtts)
+    jitter_ms = sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1) if len(rtts) > 1 else 0.0
+    return round(rtt_ms, 2), round(jitter_ms, 2), loss_pct
+
+def _parse_peer(peer):
+    host, _, port = peer.rpartition(":")
+    return host.strip("[]"), int(port)
+
+def measure_throughput(peer, local_ip=None):
+    """Streams data to a throughput sink for LINK_PROBE_THROUGHPUT_SECONDS and returns the upload rate in kbit/s.
+
+    The sink replies with the byte count it received once we close our side, so
+    the rate counts delivered bytes rather than bytes still queued locally.
+    Binding to the WiFi IP keeps the test off other interfaces. Returns None on failure.
+    """
+    try:
+        host, port = _parse_peer(peer)
+        with socket.create_connection((host, port), timeout=5, source_address=(local_ip, 0) if local_ip else None) as sock:
+            started = time.monotonic()
+            deadline = started + config.LINK_PROBE_THROUGHPUT_SECONDS
+            while time.monotonic() < deadline:
+                sock.sendall(THROUGHPUT_CHUNK)
+            sock.shutdown(socket.SHUT_WR)
+            reply = sock.makefile("rb").readline()
+            elapsed = time.monotonic() - started
+        received = int(reply.strip() or 0)
+    except (OSError, ValueError) as e:
+        logger.error(f"Throughput test to {peer} failed: {e}")
+        return None
+    return round(received * 8 / 1000 / elapsed, 1)
+
+def probe_link(wlx_interface_val, local_ip, gateway):
+    """Measures the link after a connect. Returns a dict of RTT, jitter, loss and throughput plus an `ok` verdict."""
+    logger.info(f"Probing link via gateway {gateway}...")
+    stats = {"gateway": gateway, "rtt_ms": None, "jitter_ms": None, "loss_pct": 100.0, "throughput_kbps": None}
+    if gateway:
+        stats["rtt_ms"], stats["jitter_ms"], stats["loss_pct"] = measure_rtt(gateway, wlx_interface_val)
+    if config.LINK_PROBE_THROUGHPUT_PEER:
+        stats["throughput_kbps"] = measure_throughput(config.LINK_PROBE_THROUGHPUT_PEER, local_ip)
+
+    stats["ok"], stats["verdict"] = assess_link(stats)
+    logger.info(f"Link probe: {stats}")
+    return stats
+
+def assess_link(stats):
+    """Returns (ok, reason) by comparing probe stats against the LINK_PROBE_* limits."""
+    if stats["rtt_ms"] is None:
+        return False, "No gateway reply"
+    if stats["loss_pct"] > config.LINK_PROBE_MAX_LOSS_PCT:
+        return False, f"Loss {stats['loss_pct']:g}%"
+    if stats["rtt_ms"] > config.LINK_PROBE_MAX_RTT_MS:
+        return False, f"RTT {stats['rtt_ms']:g}ms"
+    if config.LINK_PROBE_THROUGHPUT_PEER:
+        if stats["throughput_kbps"] is None:
+            return False, "Tput test failed"
+        if stats["throughput_kbps"] < config.LINK_PROBE_MIN_THROUGHPUT_KBPS:
+            return False, f"Tput {stats['throughput_kbps']:g}kb/s"
+    return True, "Link OK"
+
+def log_result(record):
+    """Appends one connection attempt, with its probe stats, to the JSON-lines results log."""
+    if not config.LINK_RESULTS_LOG_PATH:
+        return
+    record = dict(record, timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    try:
+        with open(config.LINK_RESULTS_LOG_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.error(f"Could not write results log {config.LINK_RESULTS_LOG_PATH}: {e}")
+
+
+class ThroughputSinkHandler(socketserver.StreamRequestHandler):
+    """Reads until the client closes its side, then replies with the number of bytes received."""
+
+    def handle(self):
+        received = 0
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                break
+            received += len(data)
+        self.wfile.write(f"{received}\n".encode())
+
+class ThroughputSinkServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve_throughput_sink(host="0.0.0.0", port=5201):
+    """Runs a stand-in throughput peer, e.g. on a test laptop or on the QW- device side: python3 link_probe.py --serve 5201"""
+    with ThroughputSinkServer((host, port), ThroughputSinkHandler) as server:
+        print(f"Throughput sink listening on {host}:{port}")
+        server.serve_forever()
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve_throughput_sink(port=int(sys.argv[2]) if len(sys.argv) > 2 else 5201)
+    else:
+        print("Usage: python3 link_probe.py --serve [PORT]")
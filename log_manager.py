@@ -0,0 +1,147 @@
+# log_manager.py
+
+import logging
+import sys
+import threading
+import time
+from collections import deque
+import config
+
+try:
+    from systemd import journal # Optional: "pip install systemd-python" for native journald records
+except ImportError:
+    journal = None
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+OLED_LEVEL_LETTERS = {"DEBUG": "D", "INFO": "I", "WARNING": "W", "ERROR": "E", "CRITICAL": "C"}
+JOURNAL_PRIORITIES = {"DEBUG": 7, "INFO": 6, "WARNING": 4, "ERROR": 3, "CRITICAL": 2}
+
+ring_handler = None
+flusher_thread = None
+flusher_stop_event = None
+configured_loggers = set() # Logger names given a level by the last apply_log_levels()
+
+class RingBufferHandler(logging.Handler):
+    """Logging handler that never blocks the caller on I/O.
+
+    Records go into two bounded deques: `pending`, drained in batches by the
+    flusher thread, and `recent`, which backs the OLED LOG page. When the
+    flusher falls behind, the oldest pending records are dropped and counted.
+    """
+
+    def __init__(self, ring_size, recent_size, flush_batch_size):
+        super().__init__()
+        self.pending = deque(maxlen=ring_size)
+        self.recent = deque(maxlen=recent_size)
+        self.flush_batch_size = flush_batch_size
+        self.flush_wanted = threading.Event()
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            # Resolve the message now; formatting for the sink happens on the flusher thread
+            record.message = record.getMessage()
+            record.msg, record.args = record.message, None
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.pending.append(record)
+            self.recent.append(record)
+            if len(self.pending) >= self.flush_batch_size:
+                self.flush_wanted.set()
+        except Exception:
+            self.handleError(record)
+
+    def take_pending(self):
+        batch = []
+        while self.pending:
+            try:
+                batch.append(self.pending.popleft())
+            except IndexError:
+                break
+        dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+def _write_batch(batch, dropped, formatter):
+    """Writes one batch to the configured sink with as few syscalls as possible."""
+    if dropped:
+        batch.append(logging.makeLogRecord({"name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                                            "msg": f"{dropped} log records dropped (ring buffer full)."}))
+    if not batch:
+        return
+    try:
+        if config.LOG_SINK == "journald" and journal is not None:
+            for record in batch:
+                journal.send(record.getMessage(), PRIORITY=JOURNAL_PRIORITIES.get(record.levelname, 6), SYSLOG_IDENTIFIER=record.name)
+            return
+
+        text = "".join(formatter.format(record) + "\n" for record in batch)
+        if config.LOG_SINK == "file":
+            with open(config.LOG_FILE_PATH, "a") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+    except Exception as e:
+        sys.stderr.write(f"Log flush failed, {len(batch)} records lost: {e}\n")
+
+def _flusher_target(handler, stop_event):
+    formatter = logging.Formatter(LOG_FORMAT)
+    while not stop_event.is_set():
+        handler.flush_wanted.wait(timeout=config.LOG_FLUSH_INTERVAL)
+        handler.flush_wanted.clear()
+        _write_batch(*handler.take_pending(), formatter)
+    _write_batch(*handler.take_pending(), formatter)
+
+def apply_log_levels():
+    """Applies config.LOG_LEVELS (logger name -> level name; "" is the root logger).
+
+    Loggers dropped from LOG_LEVELS since the last call are reset: modules to NOTSET
+    (following the root level again), the root logger to Python's default WARNING.
+    """
+    global configured_loggers
+    for logger_name in configured_loggers - set(config.LOG_LEVELS):
+        logging.getLogger(logger_name or None).setLevel(logging.NOTSET if logger_name else logging.WARNING)
+    configured_loggers = set(config.LOG_LEVELS)
+    for logger_name, level_name in config.LOG_LEVELS.items():
+        level = logging.getLevelName(str(level_name).upper())
+        if not isinstance(level, int):
+            logging.getLogger(__name__).warning(f"Unknown log level '{level_name}' for '{logger_name or 'root'}'.")
+            continue
+        logging.getLogger(logger_name or None).setLevel(level)
+
+def setup_logging():
+    """Routes all logging through the ring buffer and starts the background flusher."""
+    global ring_handler, flusher_thread, flusher_stop_event
+    if ring_handler:
+        return
+
+    ring_handler = RingBufferHandler(config.LOG_RING_SIZE, config.LOG_PAGE_ENTRIES, config.LOG_FLUSH_BATCH_SIZE)
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(ring_handler)
+    apply_log_levels()
+
+    flusher_stop_event = threading.Event()
+    flusher_thread = threading.Thread(target=_flusher_target, args=(ring_handler, flusher_stop_event), daemon=True)
+    flusher_thread.start()
+
+def shutdown_logging():
+    """Stops the flusher after writing out everything still buffered."""
+    global flusher_thread, flusher_stop_event
+    if flusher_stop_event:
+        flusher_stop_event.set()
+        ring_handler.flush_wanted.set()
+    if flusher_thread and flusher_thread.is_alive():
+        flusher_thread.join(timeout=2)
+    flusher_thread = None
+    flusher_stop_event = None
+
+def recent_entries():
+    """Latest log records for the OLED LOG page, newest first, as "L message (HH:MM:SS)" strings."""
+    if not ring_handler:
+        return []
+    records = list(ring_handler.recent)
+    records.reverse()
+    return [f"{OLED_LEVEL_LETTERS.get(record.levelname, '?')} {record.message} ({time.strftime('%H:%M:%S', time.localtime(record.created))})"
+            for record in records]
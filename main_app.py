@@ -1,141 +1,387 @@
 # main_app.py
 
+import logging
 import time
 import signal
+import bisect
+import threading
 # import os 
 
 import config 
 import oled_manager
 import network_operations
 import gpio_input_handler
+import ssid_filter
+import config_watcher
+import log_manager
+import control_server
+import link_probe
+import connect_engine
+from ap_table import ApTable
+
+logger = logging.getLogger(__name__)
 
 # --- Application State ---
 app_state = {
     "project_running": False,
     "current_page_title": "APs",
-    "ap_list": [],
+    "ap_table": ApTable(), # Scan results, merged in place on every rescan
+    "ap_status_message": None, # e.g. "Scanning...", "Scan Error"; shown instead of the APs title
+    "ap_letter_index": {}, # First letter after the SSID prefix -> index of the first AP with that letter
+    "ap_letter_jump": False, # Rotation jumps between first letters instead of entries
     "selected_ap_index": 0,
     "scroll_offset_ap": 0,
+    "log_entries": [], # Snapshot of recent log lines taken when the LOG page opens
+    "selected_log_index": 0,
+    "scroll_offset_log": 0,
+    "page_before_log": None,
     "connection_status": "Not Started", 
     "ip_address": None, 
     "connected_ssid": None,
+    "connected_signal": None, # Scan signal of the connected SSID
+    "link_stats": None, # Result of the post-connect link probe
+    "scroll_offset_status": 0,
     "device_hostname": f"{config.HOSTNAME_PREFIX}XXXX", 
     "wlx_interface": None, 
     "oled_instance": None,
-    "encoder_instance": None
+    "encoder_instance": None,
+    "last_scan_time": None # time.monotonic() of the last finished scan
 }
 
+# Serializes nmcli work between the encoder and the control API
+network_lock = threading.RLock()
+
+# --- AP List Helpers ---
+def _ap_sort_letter(ssid):
+    """Returns the letter an AP is grouped under for first-letter jumps (first character after its family prefix)."""
+    return ssid_filter.strip_family_prefix(ssid)[:1].upper()
+
+def _rebuild_letter_index():
+    letter_index = {}
+    for index, ap in enumerate(app_state["ap_table"]):
+        letter_index.setdefault(_ap_sort_letter(ap.ssid), index)
+    app_state["ap_letter_index"] = letter_index
+
+def _scroll_window(selected_index, scroll_offset, item_count):
+    """Clamps a selection to item_count and moves the 4-row scroll window only as far as needed to show it."""
+    selected_index = max(0, min(selected_index, item_count - 1))
+
+    if selected_index < scroll_offset:
+        scroll_offset = selected_index
+    elif selected_index >= scroll_offset + 4: 
+        scroll_offset = selected_index - 3
+    
+    scroll_offset = max(0, min(scroll_offset, item_count - 4 if item_count > 4 else 0))
+    return selected_index, scroll_offset
+
+def _keep_selection_visible():
+    app_state["selected_ap_index"], app_state["scroll_offset_ap"] = _scroll_window(
+        app_state["selected_ap_index"], app_state["scroll_offset_ap"], len(app_state["ap_table"]))
+
+def _apply_scan_results(scanned_aps, status_message):
+    """Merges a scan into the AP table, keeping the operator's selection on the same SSID when it survives."""
+    ap_table = app_state["ap_table"]
+    app_state["ap_status_message"] = status_message
+    if status_message is None:
+        selected_ssid = ap_table[app_state["selected_ap_index"]].ssid if len(ap_table) else None
+        diff = ap_table.apply_scan(scanned_aps)
+        if diff.added or diff.removed:
+            _rebuild_letter_index()
+            selected_index = ap_table.index_of(selected_ssid) if selected_ssid is not None else None
+            if selected_index is not None:
+                # Shift the window with the selection so it stays on the same OLED row
+                app_state["scroll_offset_ap"] += selected_index - app_state["selected_ap_index"]
+                app_state["selected_ap_index"] = selected_index
+        logger.info(f"Scan merged: {len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} signal changes.")
+    elif status_message == "No Interface":
+        ap_table.clear()
+        app_state["ap_letter_index"] = {}
+
+    if len(ap_table) == 0:
+        app_state["ap_letter_jump"] = False
+    _keep_selection_visible()
+    if app_state["current_page_title"] == "APs":
+        _refresh_ap_rows()
+
+def _letter_jump_index(current_index, delta):
+    """Returns the index of the first AP whose letter is `delta` letters away, alphabetically, from the current one.
+
+    The table is in first-seen order, so the target can be above or below the
+    current row; letters are walked in sorted order either way.
+    """
+    letter_index = app_state["ap_letter_index"]
+    letters = sorted(letter_index)
+    current_letter = _ap_sort_letter(app_state["ap_table"][current_index].ssid)
+    position = bisect.bisect_left(letters, current_letter)
+    if delta < 0 and letter_index[current_letter] != current_index:
+        delta += 1 # First step back lands on the first AP of the current letter
+    target = max(0, min(position + delta, len(letters) - 1))
+    return letter_index[letters[target]]
+
+def _current_jump_letter():
+    if not app_state["ap_letter_jump"]:
+        return None
+    return _ap_sort_letter(app_state["ap_table"][app_state["selected_ap_index"]].ssid) or "?"
+
+def _show_ap_page():
+    oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_table"], app_state["selected_ap_index"], app_state["scroll_offset_ap"], _current_jump_letter(), app_state["ap_status_message"])
+
+def _refresh_ap_rows():
+    """Redraws only what changed on the APs page; falls back to a full page when there are no rows to diff against."""
+    if len(app_state["ap_table"]) == 0:
+        _show_ap_page()
+        return
+    oled_manager.display_ap_rows(app_state["current_page_title"], app_state["ap_table"], app_state["selected_ap_index"], app_state["scroll_offset_ap"], _current_jump_letter(), app_state["ap_status_message"])
+
+def handle_config_reload():
+    """Applies a reloaded config.py. The AP table and any live connection are left alone; new filters apply from the next scan."""
+    ssid_filter.load_filters()
+    log_manager.apply_log_levels()
+
+# --- LOG Page ---
+def _show_status_page():
+    app_state["scroll_offset_status"] = oled_manager.display_status_page(
+        app_state["current_page_title"],
+        app_state["device_hostname"],
+        app_state["connection_status"],
+        app_state["ip_address"],
+        app_state["connected_ssid"],
+        app_state["connected_signal"],
+        app_state["link_stats"],
+        app_state["scroll_offset_status"]
+    )
+
+def _show_log_page():
+    oled_manager.display_log_page(app_state["current_page_title"], app_state["log_entries"], app_state["selected_log_index"], app_state["scroll_offset_log"])
+
+def open_log_page():
+    """Switches to the LOG page with a snapshot of the latest log entries, newest first."""
+    app_state["page_before_log"] = app_state["current_page_title"]
+    app_state["current_page_title"] = "LOG"
+    app_state["log_entries"] = log_manager.recent_entries()
+    app_state["selected_log_index"] = 0
+    app_state["scroll_offset_log"] = 0
+    _show_log_page()
+
+def close_log_page():
+    """Returns from the LOG page to the page it was opened from."""
+    app_state["current_page_title"] = app_state["page_before_log"] or "APs"
+    app_state["page_before_log"] = None
+    app_state["log_entries"] = []
+    if app_state["current_page_title"] == "STATUS":
+        _show_status_page()
+    else:
+        _show_ap_page()
+
 # --- GPIO Callback Functions (Interacting with App State) ---
 def handle_app_rotation(delta):
     """Handles rotary encoder rotation for the application."""
+    if oled_manager.wake():
+        return # The first input after the panel blanked only wakes it
     if not app_state["project_running"] or not app_state["oled_instance"]:
         return
 
     if app_state["current_page_title"] == "APs":
-        if not app_state["ap_list"] or \
-           (app_state["ap_list"] and app_state["ap_list"][0] and \
-            any(msg in app_state["ap_list"][0] for msg in ["No APs found", "No Interface", "Scan Error", "Scanning...", "Initial Scan..."])):
-            return 
-        
-        max_index = len(app_state["ap_list"]) - 1
+        max_index = len(app_state["ap_table"]) - 1
         if max_index < 0: return 
 
-        new_index = app_state["selected_ap_index"] + delta
-        app_state["selected_ap_index"] = max(0, min(new_index, max_index))
-        
-        if app_state["selected_ap_index"] < app_state["scroll_offset_ap"]:
-            app_state["scroll_offset_ap"] = app_state["selected_ap_index"]
-        elif app_state["selected_ap_index"] >= app_state["scroll_offset_ap"] + 4: 
-            app_state["scroll_offset_ap"] = app_state["selected_ap_index"] - 3
-        
-        app_state["scroll_offset_ap"] = max(0, min(app_state["scroll_offset_ap"], len(app_state["ap_list"]) - 4 if len(app_state["ap_list"]) > 4 else 0))
-        
-        oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_list"], app_state["selected_ap_index"], app_state["scroll_offset_ap"])
+        if app_state["ap_letter_jump"]:
+            new_index = _letter_jump_index(app_state["selected_ap_index"], delta)
+        else:
+            new_index = app_state["selected_ap_index"] + delta
+        new_index = max(0, min(new_index, max_index))
+        if new_index == app_state["selected_ap_index"]:
+            return
+        app_state["selected_ap_index"] = new_index
+        _keep_selection_visible()
+        _refresh_ap_rows()
+
+    elif app_state["current_page_title"] == "STATUS":
+        max_offset = oled_manager.status_page_row_count(app_state["connected_signal"], app_state["link_stats"]) - 4
+        new_offset = max(0, min(app_state["scroll_offset_status"] + delta, max_offset))
+        if new_offset == app_state["scroll_offset_status"]:
+            return
+        app_state["scroll_offset_status"] = new_offset
+        _show_status_page()
+
+    elif app_state["current_page_title"] == "LOG":
+        if not app_state["log_entries"]:
+            return
+        new_index, new_offset = _scroll_window(app_state["selected_log_index"] + delta, app_state["scroll_offset_log"], len(app_state["log_entries"]))
+        if new_index == app_state["selected_log_index"]:
+            return
+        app_state["selected_log_index"], app_state["scroll_offset_log"] = new_index, new_offset
+        _show_log_page()
+
+def handle_app_hold():
+    """Handles a long press of the rotary encoder button.
+
+    On a populated APs page it toggles first-letter jump mode; on an empty APs page
+    or the STATUS page it opens the LOG page.
+    """
+    if oled_manager.wake():
+        return
+    if not app_state["project_running"] or not app_state["oled_instance"]:
+        return
+
+    if app_state["current_page_title"] == "APs" and len(app_state["ap_table"]) > 0:
+        app_state["ap_letter_jump"] = not app_state["ap_letter_jump"]
+        logger.info(f"First-letter jump mode {'on' if app_state['ap_letter_jump'] else 'off'}.")
+        _refresh_ap_rows()
+    elif app_state["current_page_title"] in ("APs", "STATUS"):
+        open_log_page()
 
 def handle_app_click():
     """Handles rotary encoder button click for the application."""
+    if oled_manager.wake():
+        return
     if not app_state["project_running"] or not app_state["oled_instance"]:
         return
 
     if app_state["current_page_title"] == "APs":
-        if app_state["ap_list"] and \
-           not (app_state["ap_list"][0] and any(msg in app_state["ap_list"][0] for msg in ["No APs found", "No Interface", "Scan Error", "Scanning...", "Initial Scan..."])) and \
-           0 <= app_state["selected_ap_index"] < len(app_state["ap_list"]):
-            
-            selected_ssid_for_connection = app_state["ap_list"][app_state["selected_ap_index"]]
-            print(f"Selected AP: {selected_ssid_for_connection}")
-            app_state["current_page_title"] = "STATUS"
-            app_state["connection_status"] = "Connecting..." 
-            app_state["ip_address"] = None 
-            app_state["connected_ssid"] = None # Clean SSID and store selected as temporary while connection is tried
-            
-            oled_manager.display_status_page(
-                app_state["current_page_title"],
-                app_state["device_hostname"],
-                app_state["connection_status"],
-                app_state["ip_address"],
-                app_state["connected_ssid"] 
-            )
+        if 0 <= app_state["selected_ap_index"] < len(app_state["ap_table"]):
             
-            connection_result = network_operations.connect_to_wifi(selected_ssid_for_connection, app_state["wlx_interface"])
+            selected_ssid_for_connection = app_state["ap_table"][app_state["selected_ap_index"]].ssid
+            logger.info(f"Selected AP: {selected_ssid_for_connection}")
+            connect_to_ap(selected_ssid_for_connection)
+        else:
+            logger.info("No valid AP selected or AP list is empty.")
+
+    elif app_state["current_page_title"] == "LOG":
+        close_log_page()
+
+    elif app_state["current_page_title"] == "STATUS":
+        logger.info("Returning to APs page and rescanning...")
+        with network_lock:
+            disconnect_current()
+            app_state["current_page_title"] = "APs"
             
-            status_for_line_3 = ""
-            actual_ip_for_line_4 = None
-            ssid_for_line_5 = None
-
-            defined_non_ip_statuses = [
-                "No IP Acquired", "Not Connected", "Timeout", 
-                "Error Occurred", "No Interface"
-            ]
-
-            if connection_result not in defined_non_ip_statuses and connection_result is not None:
-                actual_ip_for_line_4 = connection_result
-                status_for_line_3 = "Connected"
-                ssid_for_line_5 = selected_ssid_for_connection # Set SSID if connection is succcessful
-            else:
-                status_for_line_3 = connection_result if connection_result is not None else "Error"
-                # ssid_for_line_5 stays as None (unsuccessful connection)
+            app_state["ap_status_message"] = "Scanning..."
+            _show_ap_page()
             
-            app_state["connection_status"] = status_for_line_3
-            app_state["ip_address"] = actual_ip_for_line_4
-            app_state["connected_ssid"] = ssid_for_line_5
-
-
-            oled_manager.display_status_page(
-                app_state["current_page_title"],
-                app_state["device_hostname"],
-                app_state["connection_status"],
-                app_state["ip_address"],
-                app_state["connected_ssid"]
-            )
+            rescan_aps()
+
+# --- Actions shared by the encoder and the control API ---
+def connect_to_ap(ssid):
+    """Connects to `ssid`, showing progress and the result on the STATUS page. Returns the outcome as a dict."""
+    with network_lock:
+        app_state["ap_letter_jump"] = False
+        app_state["current_page_title"] = "STATUS"
+        app_state["connection_status"] = "Connecting..." 
+        app_state["ip_address"] = None 
+        app_state["connected_ssid"] = None # Clean SSID and store selected as temporary while connection is tried
+        app_state["connected_signal"] = None
+        app_state["link_stats"] = None
+        app_state["scroll_offset_status"] = 0
+        
+        _show_status_page()
+
+        def show_attempt(attempt, bssid):
+            if attempt > 1:
+                app_state["connection_status"] = f"Retry {attempt}/{config.CONNECT_MAX_ATTEMPTS}"
+                _show_status_page()
+
+        scanned_ap = app_state["ap_table"].get(ssid)
+        connection_result, bssid = connect_engine.connect_with_retries(ssid, app_state["wlx_interface"], scanned_ap, on_attempt=show_attempt)
+        
+        status_for_line_3 = ""
+        actual_ip_for_line_4 = None
+        ssid_for_line_5 = None
+
+        if connection_result not in connect_engine.NON_IP_RESULTS and connection_result is not None:
+            actual_ip_for_line_4 = connection_result
+            status_for_line_3 = "Connected"
+            ssid_for_line_5 = ssid # Set SSID if connection is succcessful
         else:
-            print("No valid AP selected or AP list is empty/status message.")
+            status_for_line_3 = connection_result if connection_result is not None else "Error"
+            # ssid_for_line_5 stays as None (unsuccessful connection)
+        
+        app_state["connection_status"] = status_for_line_3
+        app_state["ip_address"] = actual_ip_for_line_4
+        app_state["connected_ssid"] = ssid_for_line_5
+        app_state["connected_signal"] = scanned_ap.bssids.get(bssid, scanned_ap.signal) if scanned_ap else None
 
-    elif app_state["current_page_title"] == "STATUS":
-        print("Returning to APs page and rescanning...")
+        if status_for_line_3 == "Connected" and config.LINK_PROBE_ENABLED:
+            app_state["connection_status"] = "Probing..."
+            _show_status_page()
+            gateway = network_operations.get_gateway(app_state["wlx_interface"])
+            app_state["link_stats"] = link_probe.probe_link(app_state["wlx_interface"], actual_ip_for_line_4, gateway)
+            app_state["connection_status"] = "Connected" if app_state["link_stats"]["ok"] else "Weak Link"
+            if not app_state["link_stats"]["ok"]:
+                connect_engine.record_failure(ssid, bssid, weight=0.5) # Connected, but not usefully
+
+        _show_status_page()
+        result = {
+            "ssid": ssid,
+            "status": app_state["connection_status"],
+            "ip_address": actual_ip_for_line_4,
+            "bssid": bssid,
+            "signal": app_state["connected_signal"],
+            "link": app_state["link_stats"],
+        }
+        link_probe.log_result(result)
+        return result
+
+def disconnect_current():
+    """Disconnects the WiFi interface and clears the connection state."""
+    with network_lock:
         app_state["connection_status"] = network_operations.disconnect_wifi(app_state["wlx_interface"], app_state["connection_status"])
         app_state["ip_address"] = None 
         app_state["connected_ssid"] = None # Clean connected SSID
-        app_state["current_page_title"] = "APs"
-        
-        scan_message = "Scanning..."
-        app_state["ap_list"] = [scan_message] 
-        app_state["selected_ap_index"] = 0
-        app_state["scroll_offset_ap"] = 0
-        oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_list"], app_state["selected_ap_index"], app_state["scroll_offset_ap"])
-        
-        app_state["ap_list"] = network_operations.scan_wifi_networks(app_state["wlx_interface"])
-        oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_list"], app_state["selected_ap_index"], app_state["scroll_offset_ap"])
+        app_state["connected_signal"] = None
+        app_state["link_stats"] = None
+        app_state["scroll_offset_status"] = 0
+        if app_state["current_page_title"] == "STATUS":
+            _show_status_page()
+        return {"status": app_state["connection_status"]}
+
+def rescan_aps():
+    """Rescans and merges the results into the AP table; a visible APs page updates in place."""
+    with network_lock:
+        app_state["ap_status_message"] = "Scanning..."
+        if app_state["current_page_title"] == "APs":
+            _refresh_ap_rows()
+        _apply_scan_results(*network_operations.scan_wifi_networks(app_state["wlx_interface"]))
+        app_state["last_scan_time"] = time.monotonic()
+
+def scan_age():
+    """Seconds since the last finished scan, or None if there has not been one."""
+    if app_state["last_scan_time"] is None:
+        return None
+    return time.monotonic() - app_state["last_scan_time"]
+
+def get_ap_list():
+    with network_lock:
+        return {
+            "aps": [{"ssid": ap.ssid, "signal": ap.signal, "bssids": ap.bssids, "failure_score": round(connect_engine.failure_score(ap.ssid), 2)}
+                    for ap in app_state["ap_table"]],
+            "status_message": app_state["ap_status_message"],
+            "scan_age": scan_age(),
+        }
+
+def get_status():
+    return {
+        "project_running": app_state["project_running"],
+        "page": app_state["current_page_title"],
+        "hostname": app_state["device_hostname"],
+        "interface": app_state["wlx_interface"],
+        "connection_status": app_state["connection_status"],
+        "ip_address": app_state["ip_address"],
+        "connected_ssid": app_state["connected_ssid"],
+        "signal": app_state["connected_signal"],
+        "link": app_state["link_stats"],
+        "display": oled_manager.get_refresh_stats(),
+    }
 
 def start_project_sequence():
     """Orchestrates the project startup."""
     if app_state["project_running"]:
-        print("Project is already running.")
+        logger.info("Project is already running.")
         return
 
-    print("Starting project sequence...")
+    logger.info("Starting project sequence...")
     if not app_state["oled_instance"]:
-        print("CRITICAL ERROR: OLED not available at project start.")
+        logger.critical("OLED not available at project start.")
         return
             
     app_state["project_running"] = True
@@ -156,33 +402,37 @@ def start_project_sequence():
     app_state["ip_address"] = None 
     app_state["connected_ssid"] = None # No connected SSID during start-up
     
-    scan_message = "Initial Scan..."
-    app_state["ap_list"] = [scan_message]
-    app_state["selected_ap_index"] = 0
-    app_state["scroll_offset_ap"] = 0
-    oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_list"], app_state["selected_ap_index"], app_state["scroll_offset_ap"])
+    with network_lock:
+        app_state["ap_table"].clear()
+        app_state["ap_letter_index"] = {}
+        app_state["ap_letter_jump"] = False
+        app_state["ap_status_message"] = "Initial Scan..."
+        app_state["selected_ap_index"] = 0
+        app_state["scroll_offset_ap"] = 0
+        _show_ap_page()
 
-    app_state["ap_list"] = network_operations.scan_wifi_networks(app_state["wlx_interface"])
+        _apply_scan_results(*network_operations.scan_wifi_networks(app_state["wlx_interface"]))
+        app_state["last_scan_time"] = time.monotonic()
     app_state["connection_status"] = "Not Connected" 
-    oled_manager.display_ap_page(app_state["current_page_title"], app_state["ap_list"], app_state["selected_ap_index"], app_state["scroll_offset_ap"])
-    print("Project sequence started.")
+    logger.info("Project sequence started.")
 
 def stop_project_sequence():
     """Orchestrates the project shutdown."""
     if not app_state["project_running"]:
-        print("Project is not running or already stopped.")
+        logger.info("Project is not running or already stopped.")
         if app_state["oled_instance"] and not app_state["project_running"]: 
              oled_manager.show_initial_boot_message()
         return
 
-    print("Stopping project sequence...")
+    logger.info("Stopping project sequence...")
     was_running = app_state["project_running"]
     app_state["project_running"] = False 
     
-    if was_running and app_state["wlx_interface"]:
-        app_state["connection_status"] = network_operations.disconnect_wifi(app_state["wlx_interface"], app_state["connection_status"])
-    else:
-        app_state["connection_status"] = "Not Connected"
+    with network_lock:
+        if was_running and app_state["wlx_interface"]:
+            app_state["connection_status"] = network_operations.disconnect_wifi(app_state["wlx_interface"], app_state["connection_status"])
+        else:
+            app_state["connection_status"] = "Not Connected"
 
     app_state["ip_address"] = None 
     app_state["connected_ssid"] = None # Clean connected SSID
@@ -192,45 +442,57 @@ def stop_project_sequence():
         time.sleep(2)
         oled_manager.show_initial_boot_message()
     
-    print("Project sequence stopped. Press GPIO {} to restart.".format(config.START_BUTTON_GPIO))
+    logger.info("Project sequence stopped. Press GPIO {} to restart.".format(config.START_BUTTON_GPIO))
 
 # --- Main Execution ---
 def main():
     """Main program entry point."""
-    print("Raspberry Pi WiFi Manager Project - Modular Version")
-    print(f"Use GPIO {config.START_BUTTON_GPIO} switch to start.")
-    print(f"Use GPIO {config.STOP_BUTTON_GPIO} switch to stop.")
+    log_manager.setup_logging()
+    logger.info("Raspberry Pi WiFi Manager Project - Modular Version")
+    logger.info(f"Use GPIO {config.START_BUTTON_GPIO} switch to start.")
+    logger.info(f"Use GPIO {config.STOP_BUTTON_GPIO} switch to stop.")
 
     app_state["oled_instance"] = oled_manager.init_oled()
     if app_state["oled_instance"]:
          oled_manager.show_initial_boot_message()
     else:
-        print("CRITICAL: OLED display could not be initialized.")
+        logger.critical("OLED display could not be initialized.")
         return 
 
     app_state["encoder_instance"] = gpio_input_handler.setup_gpio(
         rotate_cb=handle_app_rotation,
         click_cb=handle_app_click,
+        hold_cb=handle_app_hold,
         start_cb=start_project_sequence,
         stop_cb=stop_project_sequence
     )
 
     if not app_state["encoder_instance"]: 
-        print("CRITICAL: GPIO setup failed. Exiting.")
+        logger.critical("GPIO setup failed. Exiting.")
         if app_state["oled_instance"]:
              oled_manager.display_message("ERROR:","GPIO Setup","Failed.","Exiting.")
         return 
 
+    config_watcher.start_config_watcher(on_reload=handle_config_reload)
+    control_server.start_control_server(
+        status_cb=get_status,
+        list_cb=get_ap_list,
+        scan_cb=rescan_aps,
+        scan_age_cb=scan_age,
+        connect_cb=connect_to_ap,
+        disconnect_cb=disconnect_current
+    )
+
     try:
-        print("Application running. Press Ctrl+C to exit.")
+        logger.info("Application running. Press Ctrl+C to exit.")
         while True: 
             signal.pause() 
     except KeyboardInterrupt:
-        print("\nCtrl+C detected. Shutting down...")
+        logger.info("Ctrl+C detected. Shutting down...")
     except Exception as e:
-        print(f"An unexpected error occurred in main loop: {e}")
+        logger.error(f"An unexpected error occurred in main loop: {e}")
     finally:
-        print("Initiating final cleanup...")
+        logger.info("Initiating final cleanup...")
         if app_state["project_running"]:
             stop_project_sequence() 
         
@@ -238,9 +500,13 @@ def main():
             oled_manager.show_goodbye() 
             time.sleep(1)
             oled_manager.clear_oled_and_stop_scroll() 
+        oled_manager.stop_refresh_governor()
         
+        control_server.stop_control_server()
+        config_watcher.stop_config_watcher()
         gpio_input_handler.cleanup_gpio() 
-        print("Program terminated.")
+        logger.info("Program terminated.")
+        log_manager.shutdown_logging()
 
 if __name__ == "__main__":
     main()
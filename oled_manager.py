@@ -1,33 +1,197 @@
 # oled_manager.py
 
+import logging
 from board import SCL, SDA
 import busio
 from oled_text import OledText # Make sure oled-text is installed with "pip install oled-text"
 import threading
 import time
+from contextlib import contextmanager
 import config
+import ssid_filter
+import connect_engine
+
+logger = logging.getLogger(__name__)
 
 oled_instance = None
 active_scrolling_threads = [] 
 
+AP_ROWS_PER_PAGE = 4
+
+# What the APs page currently shows, so navigation only redraws rows that changed
+drawn_ap_title = None
+drawn_ap_rows = {} # OLED line number -> (prefix label, AP name)
+
+# Refresh governor: every I2C frame push goes through _push_frame under frame_lock
+frame_lock = threading.RLock()
+pending_line_writes = 0 # Line writes since the last frame push
+frame_wanted = threading.Event()
+activity_condition = threading.Condition() # Notified on activity and on scroll stops, to release parked marquees
+last_activity_time = time.monotonic()
+panel_state = "on" # "on", "dim" or "off"
+refresh_stats = {"frames_pushed": 0, "frames_avoided": 0.0}
+parked_marquees = {} # Scroll thread ident -> time.monotonic() when it parked
+governor_thread = None
+governor_stop_event = None
+
 def init_oled():
     """Initializes the OLED display."""
     global oled_instance
     try:
         i2c = busio.I2C(SCL, SDA)
-        oled_instance = OledText(i2c, config.OLED_WIDTH, config.OLED_HEIGHT, auto_show=True)
+        # Frames are pushed by _push_frame / the refresh governor, never implicitly per line
+        oled_instance = OledText(i2c, config.OLED_WIDTH, config.OLED_HEIGHT, auto_show=False)
         oled_instance.clear()
+        oled_instance.disp.contrast(config.OLED_CONTRAST)
+        _start_refresh_governor()
         return oled_instance
     except Exception as e:
-        print(f"ERROR: OLED initialization failed: {e}")
+        logger.error(f"OLED initialization failed: {e}")
         oled_instance = None
         return None
 
+def _write_line(text, line_num):
+    """Updates one line of the frame buffer; the I2C push happens later in _push_frame."""
+    global pending_line_writes
+    with frame_lock:
+        oled_instance.text(text, line_num)
+        pending_line_writes += 1
+
+def _push_frame():
+    """Sends the current frame over I2C unless nothing changed or the panel is off. Returns True if a frame was sent."""
+    global pending_line_writes
+    with frame_lock:
+        if pending_line_writes == 0:
+            return False
+        line_writes, pending_line_writes = pending_line_writes, 0
+        if panel_state == "off":
+            refresh_stats["frames_avoided"] += line_writes
+            return False
+        oled_instance.show()
+        refresh_stats["frames_pushed"] += 1
+        refresh_stats["frames_avoided"] += line_writes - 1
+        return True
+
+@contextmanager
+def _single_frame():
+    """Groups several line writes into one I2C frame push, sent as soon as the block ends.
+
+    Page draws are changes worth seeing, so they also count as activity for the governor.
+    """
+    try:
+        yield
+    finally:
+        if oled_instance:
+            _note_activity()
+            _push_frame()
+
+def _idle_seconds():
+    return time.monotonic() - last_activity_time
+
+def _note_activity():
+    global last_activity_time
+    last_activity_time = time.monotonic()
+    _set_panel_state("on")
+    _notify_activity()
+
+def _notify_activity():
+    with activity_condition:
+        activity_condition.notify_all()
+
+def _marquee_parked():
+    return _idle_seconds() >= config.OLED_MARQUEE_IDLE_TIMEOUT or panel_state == "off"
+
+def _set_panel_state(new_state):
+    """Switches the panel between on, dimmed (low contrast) and off (SSD1306 display-off). Returns the previous state."""
+    global panel_state, pending_line_writes
+    with frame_lock:
+        previous_state = panel_state
+        if not oled_instance or new_state == previous_state:
+            return previous_state
+        try:
+            if new_state == "off":
+                oled_instance.disp.poweroff()
+            else:
+                if previous_state == "off":
+                    oled_instance.disp.poweron()
+                oled_instance.disp.contrast(config.OLED_DIM_CONTRAST if new_state == "dim" else config.OLED_CONTRAST)
+        except Exception as e:
+            logger.error(f"Could not switch OLED panel to '{new_state}': {e}")
+            return previous_state
+        panel_state = new_state
+        if previous_state == "off":
+            # Writes made while the panel was off were dropped; show the current frame now
+            oled_instance.show()
+            refresh_stats["frames_pushed"] += 1
+            refresh_stats["frames_avoided"] += max(pending_line_writes - 1, 0)
+            pending_line_writes = 0
+    logger.debug(f"OLED panel {previous_state} -> {new_state}")
+    return previous_state
+
+def wake():
+    """Marks user input and restores a dimmed or blanked panel at once.
+
+    Returns True if the panel was off, so callers can let that first input only wake the display.
+    """
+    global last_activity_time
+    last_activity_time = time.monotonic()
+    was_off = _set_panel_state("on") == "off"
+    _notify_activity()
+    return was_off
+
+def _governor_target(stop_event):
+    """Pushes scroll-thread frames at most OLED_MAX_FPS times a second and dims/blanks the panel when idle."""
+    while not stop_event.is_set():
+        frame_wanted.wait(timeout=1.0)
+        frame_wanted.clear()
+        idle = _idle_seconds()
+        if config.OLED_BLANK_TIMEOUT and idle >= config.OLED_BLANK_TIMEOUT:
+            _set_panel_state("off")
+        elif config.OLED_DIM_TIMEOUT and idle >= config.OLED_DIM_TIMEOUT:
+            _set_panel_state("dim")
+        _push_frame()
+        if stop_event.wait(timeout=1.0 / config.OLED_MAX_FPS):
+            break
+
+def _start_refresh_governor():
+    global governor_thread, governor_stop_event
+    if governor_thread and governor_thread.is_alive():
+        return
+    governor_stop_event = threading.Event()
+    governor_thread = threading.Thread(target=_governor_target, args=(governor_stop_event,), daemon=True)
+    governor_thread.start()
+
+def stop_refresh_governor():
+    global governor_thread, governor_stop_event
+    if governor_stop_event:
+        governor_stop_event.set()
+        frame_wanted.set()
+    if governor_thread and governor_thread.is_alive():
+        governor_thread.join(timeout=1)
+    governor_thread = None
+    governor_stop_event = None
+
+def get_refresh_stats():
+    """Frames pushed and frames avoided, plus the panel state.
+
+    Without the governor every line write would push a frame and every marquee would
+    step each OLED_SCROLL_DELAY. frames_avoided counts the difference: line writes
+    merged into one push or dropped while the panel is off, plus the scroll steps
+    marquees did not take while slowed down or parked (parked time counts up live).
+    """
+    with frame_lock:
+        now = time.monotonic()
+        parked_steps = sum(now - parked_at for parked_at in parked_marquees.values()) / config.OLED_SCROLL_DELAY
+        return dict(frames_pushed=refresh_stats["frames_pushed"],
+                    frames_avoided=int(refresh_stats["frames_avoided"] + parked_steps),
+                    panel_state=panel_state, idle_seconds=round(_idle_seconds(), 1))
+
 def _stop_all_scrolling_threads():
     """Stops all active scrolling threads."""
     global active_scrolling_threads
     for thread, stop_event in active_scrolling_threads:
         stop_event.set()
+    _notify_activity()
     for thread, _ in active_scrolling_threads:
         if thread.is_alive():
             thread.join(timeout=0.1) 
@@ -50,12 +214,37 @@ def _scrolling_thread_target(label, value_to_scroll, line_num, value_display_wid
         
         current_line_text = f"{label}{scrolling_part}"
         try:
-            oled_instance.text(current_line_text.ljust(config.OLED_LINE_MAX_CHARS), line_num)
+            _write_line(current_line_text.ljust(config.OLED_LINE_MAX_CHARS), line_num)
+            frame_wanted.set()
         except Exception:
             pass 
-            
-        if stop_event.wait(timeout=config.OLED_SCROLL_DELAY):
+
+        if _marquee_parked():
+            # Park on the start of the text: draw it once, then write nothing until activity or a stop
+            if idx != 0:
+                idx = 0
+                continue
+            with frame_lock:
+                parked_marquees[threading.get_ident()] = time.monotonic()
+            with activity_condition:
+                while not stop_event.is_set() and _marquee_parked():
+                    activity_condition.wait()
+            with frame_lock:
+                parked_at = parked_marquees.pop(threading.get_ident())
+                refresh_stats["frames_avoided"] += (time.monotonic() - parked_at) / config.OLED_SCROLL_DELAY
+            continue
+
+        scroll_delay = config.OLED_SCROLL_DELAY
+        slowed = _idle_seconds() >= config.OLED_IDLE_SLOWDOWN_AFTER
+        if slowed:
+            scroll_delay *= config.OLED_IDLE_SCROLL_SLOWDOWN
+        step_started = time.monotonic()
+        if stop_event.wait(timeout=scroll_delay):
             break
+        if slowed:
+            # Steps a full-speed marquee would have taken during this one slow step
+            with frame_lock:
+                refresh_stats["frames_avoided"] += (time.monotonic() - step_started) / config.OLED_SCROLL_DELAY - 1
         
         idx += 1
         if idx >= (len(value_to_scroll) + len(separator)): 
@@ -72,19 +261,11 @@ def _display_line(label, value, line_num, current_page_title=None, is_selected_a
     value_display_width = config.OLED_LINE_MAX_CHARS - len(label)
     if value_display_width < 0: value_display_width = 0
 
+    # Values scroll once they no longer fit after their label (on STATUS: Hostname 8, Status 10, IP 14, SSID 12 chars)
     scroll_if_value_longer_than = value_display_width 
     can_this_line_scroll = True 
 
-    if current_page_title == "STATUS":
-        if line_num == 2: # Hostname: 
-            scroll_if_value_longer_than = 8
-        elif line_num == 3: # Status: 
-            scroll_if_value_longer_than = 10
-        elif line_num == 4: # IP: 
-            scroll_if_value_longer_than = 14
-        elif line_num == 5: # SSID: 
-            scroll_if_value_longer_than = 12
-    elif current_page_title == "APs":
+    if current_page_title in ("APs", "LOG"):
         if not is_selected_ap_line:
             can_this_line_scroll = False
 
@@ -94,7 +275,7 @@ def _display_line(label, value, line_num, current_page_title=None, is_selected_a
             display_value = value[:value_display_width] 
         
         full_line = f"{label}{display_value}"
-        oled_instance.text(full_line.ljust(config.OLED_LINE_MAX_CHARS), line_num)
+        _write_line(full_line.ljust(config.OLED_LINE_MAX_CHARS), line_num)
     else:
         stop_event = threading.Event()
         thread = threading.Thread(
@@ -105,75 +286,179 @@ def _display_line(label, value, line_num, current_page_title=None, is_selected_a
         active_scrolling_threads.append((thread, stop_event))
         thread.start()
 
-def clear_oled_and_stop_scroll():
+def _start_new_page():
+    """Stops scrolling and forgets the drawn APs rows. No I2C traffic: every page rewrites all 5 lines in one frame."""
+    global drawn_ap_title, drawn_ap_rows
     _stop_all_scrolling_threads()
+    drawn_ap_title = None
+    drawn_ap_rows = {}
+
+def clear_oled_and_stop_scroll():
+    _start_new_page()
     if oled_instance:
-        oled_instance.clear()
+        with frame_lock:
+            oled_instance.clear()
 
 def display_message(line1, line2=None, line3=None, line4=None, line5=None):
     """Displays up to 5 lines of static text, scrolling if necessary by default rule."""
-    clear_oled_and_stop_scroll()
+    _start_new_page()
     if not oled_instance: return
     
     lines_to_display = [line1, line2, line3, line4, line5]
-    for i, text_line in enumerate(lines_to_display):
-        # OLED lines are 1-indexed
-        oled_line_num = i + 1
-        if text_line is not None: 
-             _display_line("", str(text_line), oled_line_num)
-        else: 
-             _display_line("", "", oled_line_num) # Clear the line
-
-
-def display_ap_page(current_page_title_val, ap_list_val, selected_ap_index_val, scroll_offset_ap_val):
-    """Displays the APs page on the OLED screen (up to 4 APs + title)."""
-    clear_oled_and_stop_scroll()
+    with _single_frame():
+        for i, text_line in enumerate(lines_to_display):
+            # OLED lines are 1-indexed
+            oled_line_num = i + 1
+            if text_line is not None: 
+                 _display_line("", str(text_line), oled_line_num)
+            else: 
+                 _display_line("", "", oled_line_num) # Clear the line
+
+
+def _ap_page_title(jump_letter=None, status_message=None):
+    if status_message:
+        return "[" + status_message[:16].center(16, "~") + "]"
+    if jump_letter:
+        return "[" + f"APs {jump_letter}".center(16, "~") + "]"
+    return "[~~~~~~~APs~~~~~~]"
+
+def _format_ap_row(ap):
+    """Row text for one AccessPoint: 2-digit signal, then the SSID. A "!" separator marks SSIDs that keep failing to connect."""
+    separator = "!" if connect_engine.is_chronic_failure(ap.ssid) else " "
+    return f"{min(ap.signal, 99):>2}{separator}{ap.ssid}"
+
+def display_ap_page(current_page_title_val, ap_list_val, selected_ap_index_val, scroll_offset_ap_val, jump_letter=None, status_message=None):
+    """Displays the APs page on the OLED screen (up to 4 APs + title).
+
+    ap_list_val is a sequence of AccessPoints. With no APs the status message (or a
+    "No APs" note) fills the first row; otherwise it replaces the title.
+    """
+    _start_new_page()
     if not oled_instance: return
 
-    title_display_label = "" 
-    _display_line(title_display_label, "[~~~~~~~APs~~~~~~]", 1, current_page_title=current_page_title_val, is_title=True)
+    if len(ap_list_val) == 0:
+        empty_message = status_message if status_message else f"No {ssid_filter.describe()} APs"
+        with _single_frame():
+            _display_line("", _ap_page_title(), 1, current_page_title=current_page_title_val, is_title=True)
+            _display_line("  ", empty_message, 2, current_page_title=current_page_title_val)
+            for i in range(3, 6): 
+                _display_line("  ", "", i, current_page_title=current_page_title_val) 
+        return
+
+    display_ap_rows(current_page_title_val, ap_list_val, selected_ap_index_val, scroll_offset_ap_val, jump_letter, status_message)
 
-    if not ap_list_val or not ap_list_val[0] or any(msg in ap_list_val[0] for msg in ["No APs found", "No Interface", "Scan Error", "Scanning...", "Initial Scan..."]):
-        status_message = ap_list_val[0] if (ap_list_val and ap_list_val[0]) else "No APs found"
-        _display_line("  ", status_message, 2, current_page_title=current_page_title_val)
-        for i in range(3, 6): 
-            _display_line("  ", "", i, current_page_title=current_page_title_val) 
+def display_ap_rows(current_page_title_val, ap_list_val, selected_ap_index_val, scroll_offset_ap_val, jump_letter=None, status_message=None):
+    """Redraws only the title and the visible AP rows whose content changed since the last draw.
+
+    Only the 4 rows inside the scroll window are ever looked at, so the cost of a
+    navigation step or a rescan merge does not depend on how many APs were found.
+    """
+    global drawn_ap_title
+    if not oled_instance: return
+
+    title = _ap_page_title(jump_letter, status_message)
+    rows = {}
+    for i in range(AP_ROWS_PER_PAGE):
+        ap_index = scroll_offset_ap_val + i
+        if ap_index < len(ap_list_val):
+            prefix_label = "> " if ap_index == selected_ap_index_val else "  "
+            rows[i + 2] = (prefix_label, _format_ap_row(ap_list_val[ap_index]))
+        else:
+            rows[i + 2] = ("  ", "")
+
+    changed_rows = {line_num: row for line_num, row in rows.items() if drawn_ap_rows.get(line_num) != row}
+    if title == drawn_ap_title and not changed_rows:
         return
 
-    displayable_aps_on_page = ap_list_val[scroll_offset_ap_val : scroll_offset_ap_val + 4] 
+    # Only the selected row scrolls, so its scroll thread has to go if that row changes
+    if any(row[0] == "> " or drawn_ap_rows.get(line_num, ("", ""))[0] == "> " for line_num, row in changed_rows.items()):
+        _stop_all_scrolling_threads()
 
-    for i, ap_name in enumerate(displayable_aps_on_page):
-        oled_line_num = i + 2 
-        is_selected = (i + scroll_offset_ap_val) == selected_ap_index_val
-        prefix_label = "> " if is_selected else "  "
-        _display_line(prefix_label, ap_name, oled_line_num, current_page_title=current_page_title_val, is_selected_ap_line=is_selected)
-    
-    num_displayed_aps = len(displayable_aps_on_page)
-    for i in range(num_displayed_aps, 4): 
-         oled_line_num_to_clear = i + 2
-         _display_line("  ", "", oled_line_num_to_clear, current_page_title=current_page_title_val)
+    with _single_frame():
+        if title != drawn_ap_title:
+            _display_line("", title, 1, current_page_title=current_page_title_val, is_title=True)
+            drawn_ap_title = title
+        for line_num, (prefix_label, row_text) in changed_rows.items():
+            _display_line(prefix_label, row_text, line_num, current_page_title=current_page_title_val, is_selected_ap_line=(prefix_label == "> "))
+            drawn_ap_rows[line_num] = (prefix_label, row_text)
 
 
-def display_status_page(current_page_title_val, device_hostname_val, connection_status_text, ip_address_text=None, connected_ssid_text=None):
-    """Displays the Status page on the OLED screen. IP and SSID are on new lines if successful/available."""
-    clear_oled_and_stop_scroll()
-    if not oled_instance: return
-    
-    title_display_label = "" 
-    _display_line(title_display_label, "[~~~~~STATUS~~~~~]", 1, current_page_title=current_page_title_val, is_title=True)
-    
-    _display_line("Hostname: ", device_hostname_val, 2, current_page_title=current_page_title_val)
-    _display_line("Status: ", connection_status_text, 3, current_page_title=current_page_title_val)
+def _format_link_stat(value, unit, decimals=1):
+    return "N/A" if value is None else f"{value:.{decimals}f}{unit}"
+
+def _format_throughput(kbps):
+    if kbps is not None and kbps >= 1000:
+        return _format_link_stat(kbps / 1000, "Mb/s")
+    return _format_link_stat(kbps, "kb/s", 0)
+
+STATUS_LINK_ROWS = 5 # Link, RTT, Jitter, Loss, Tput
+
+def status_page_row_count(signal_val=None, link_stats_val=None):
+    """Number of STATUS rows (4 fit on screen) for the given signal and link probe results."""
+    return 4 + (signal_val is not None) + (STATUS_LINK_ROWS if link_stats_val else 0)
+
+def display_status_page(current_page_title_val, device_hostname_val, connection_status_text, ip_address_text=None, connected_ssid_text=None,
+                        signal_val=None, link_stats_val=None, scroll_offset_status_val=0):
+    """Displays the Status page on the OLED screen. IP and SSID are on new lines if successful/available.
+
+    After a link probe, signal and probe results follow as extra rows; 4 rows fit under
+    the title, so the page scrolls from scroll_offset_status_val. Returns the offset used.
+    """
+    _start_new_page()
     
-    ip_val_to_show = ip_address_text if ip_address_text else "N/A"
-    _display_line("IP: ", ip_val_to_show, 4, current_page_title=current_page_title_val)
+    rows = [
+        ("Hostname: ", device_hostname_val),
+        ("Status: ", connection_status_text),
+        ("IP: ", ip_address_text if ip_address_text else "N/A"),
+        ("SSID: ", connected_ssid_text if connected_ssid_text else "N/A"),
+    ]
+    if signal_val is not None:
+        rows.append(("Signal: ", f"{signal_val}%"))
+    if link_stats_val:
+        rows.extend([
+            ("Link: ", link_stats_val["verdict"]),
+            ("RTT: ", _format_link_stat(link_stats_val["rtt_ms"], "ms")),
+            ("Jitter: ", _format_link_stat(link_stats_val["jitter_ms"], "ms")),
+            ("Loss: ", _format_link_stat(link_stats_val["loss_pct"], "%", 0)),
+            ("Tput: ", _format_throughput(link_stats_val["throughput_kbps"])),
+        ])
+    scroll_offset_status_val = max(0, min(scroll_offset_status_val, status_page_row_count(signal_val, link_stats_val) - 4))
+    if not oled_instance: return scroll_offset_status_val
 
-    ssid_val_to_show = connected_ssid_text if connected_ssid_text else "N/A"
-    _display_line("SSID: ", ssid_val_to_show, 5, current_page_title=current_page_title_val) # Using "ID:" for SSID label
+    with _single_frame():
+        title_display_label = "" 
+        _display_line(title_display_label, "[~~~~~STATUS~~~~~]", 1, current_page_title=current_page_title_val, is_title=True)
+        
+        for i, (label, value) in enumerate(rows[scroll_offset_status_val:scroll_offset_status_val + 4]):
+            _display_line(label, value, i + 2, current_page_title=current_page_title_val)
     
     # Clear line 6 if your OLED screen might show remnants from a previous 6-line display
     # But not needed since oled-text can't handle more than 5 lines on a 128x64 display with the currently used layout and font
     # _display_line("  ","",6, current_page_title=current_page_title_val)
+    return scroll_offset_status_val
+
+
+def display_log_page(current_page_title_val, log_entries_val, selected_log_index_val, scroll_offset_log_val):
+    """Displays the LOG page: 4 log entries, newest first. Only the selected entry scrolls."""
+    _start_new_page()
+    if not oled_instance: return
+
+    with _single_frame():
+        _display_line("", "[~~~~~~~LOG~~~~~~]", 1, current_page_title=current_page_title_val, is_title=True)
+        if not log_entries_val:
+            _display_line("  ", "No log entries", 2, current_page_title=current_page_title_val)
+            for i in range(3, 6):
+                _display_line("  ", "", i, current_page_title=current_page_title_val)
+            return
+
+        for i in range(AP_ROWS_PER_PAGE):
+            entry_index = scroll_offset_log_val + i
+            if entry_index < len(log_entries_val):
+                is_selected = entry_index == selected_log_index_val
+                prefix_label = "> " if is_selected else "  "
+                _display_line(prefix_label, log_entries_val[entry_index], i + 2, current_page_title=current_page_title_val, is_selected_ap_line=is_selected)
+            else:
+                _display_line("  ", "", i + 2, current_page_title=current_page_title_val)
 
 
 def show_initial_boot_message():
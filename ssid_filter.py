@@ -0,0 +1,101 @@
+# ssid_filter.py
+
+import logging
+import fnmatch
+import re
+import config
+
+logger = logging.getLogger(__name__)
+
+REGEX_PATTERN_MARKER = "re:"
+GLOB_CHARS = "*?["
+
+# (compiled matcher, [(pattern, password, literal prefix)] in group order), swapped as one object on reload
+_compiled = (None, [])
+
+def _pattern_to_regex(pattern):
+    """Translates one filter entry into a regex that must match the whole SSID."""
+    if pattern.startswith(REGEX_PATTERN_MARKER):
+        return f"(?:{pattern[len(REGEX_PATTERN_MARKER):]}).*"
+    if any(c in pattern for c in GLOB_CHARS):
+        return fnmatch.translate(pattern)
+    return re.escape(pattern) + ".*"
+
+def _literal_prefix(pattern):
+    """Fixed leading text every matching SSID shares; empty for regexes."""
+    if pattern.startswith(REGEX_PATTERN_MARKER):
+        return ""
+    for i, c in enumerate(pattern):
+        if c in GLOB_CHARS:
+            return pattern[:i]
+    return pattern
+
+def load_filters(filters=None):
+    """Compiles the configured filters into a single alternation regex.
+
+    `filters` maps a pattern to the password for that product family (None means
+    config.WIFI_PASSWORD). Patterns are plain prefixes ("QW-"), globs ("QW-*-LAB")
+    or regexes marked with "re:" ("re:QW-[0-9]+"). When several patterns match an
+    SSID, the first one listed wins. Invalid patterns are skipped with a warning; if
+    the combined regex still fails to compile, the previous filters stay active.
+    """
+    global _compiled
+    if filters is None:
+        filters = getattr(config, "WIFI_SSID_FILTERS", None) or {config.WIFI_SSID_PREFIX_FILTER: None}
+
+    families = []
+    alternatives = []
+    for pattern, password in filters.items():
+        # Validate the wrapped form: the named group shifts numbered backreferences
+        alternative = f"(?P<f{len(families)}>{_pattern_to_regex(pattern)})"
+        try:
+            re.compile(alternative)
+        except re.error as e:
+            logger.warning(f"Ignoring invalid SSID filter '{pattern}': {e}")
+            continue
+        alternatives.append(alternative)
+        families.append((pattern, password, _literal_prefix(pattern)))
+
+    try:
+        matcher = re.compile("|".join(alternatives), re.DOTALL) if alternatives else None
+    except re.error as e:
+        logger.error(f"SSID filters not loaded, keeping previous filters: {e}")
+        return
+    _compiled = (matcher, families)
+    logger.info(f"SSID filters loaded: {[family[0] for family in families]}")
+
+def _match_family(ssid):
+    matcher, families = _compiled
+    if matcher is None:
+        return None
+    match = matcher.fullmatch(ssid)
+    if match is None:
+        return None
+    return families[int(match.lastgroup[1:])]
+
+def matches(ssid):
+    """True if the SSID belongs to any configured product family."""
+    return _match_family(ssid) is not None
+
+def password_for(ssid):
+    """Returns the password for the SSID's product family, falling back to config.WIFI_PASSWORD."""
+    family = _match_family(ssid)
+    if family is None or family[1] is None:
+        return config.WIFI_PASSWORD
+    return family[1]
+
+def strip_family_prefix(ssid):
+    """Removes the fixed prefix of the SSID's family (e.g. "QW-") so SSIDs can be grouped by what follows it."""
+    family = _match_family(ssid)
+    if family is None:
+        return ssid
+    return ssid[len(family[2]):]
+
+def describe():
+    """Short label for the active filters, used in messages like "No QW- APs"."""
+    _, families = _compiled
+    if len(families) == 1:
+        return families[0][0]
+    return "matching"
+
+load_filters()